@@ -29,6 +29,10 @@ the end:
 
 '''
 
+import heapq
+import itertools
+import weakref
+
 import bge
 
 import bat.bats
@@ -37,32 +41,22 @@ import bat.utils
 DEBUG = False
 
 class Trigger:
-    def __init__(self):
-        self.current_frame = bat.bats.Timekeeper().current_frame
-
-    def is_next_frame(self):
-        '''
-        Only consider animation to be complete if the next frame has actually
-        been drawn.
-        '''
-        frame_num = bat.bats.Timekeeper().current_frame
-        if self.current_frame == frame_num:
-            return False
-        self.current_frame = frame_num
-        return True
+    '''
+    Base class for animation triggers. The Animator only evaluates triggers
+    once per rendered frame, and it fetches the action state (playing flag and
+    action frame) once per object and layer - check() is handed the values
+    rather than reading them from the object.
+    '''
 
 class TriggerEnd(Trigger):
     '''Runs a callback when an animation finishes.'''
 
     def __init__(self, layer, callback):
-        Trigger.__init__(self)
         self.layer = layer
         self.callback = callback
 
-    def evaluate(self, ob):
-        if not self.is_next_frame():
-            return False
-        if not ob.isPlayingAction(self.layer):
+    def check(self, playing, frame):
+        if not playing:
             self.callback()
             return True
         else:
@@ -72,15 +66,12 @@ class TriggerGTE(Trigger):
     '''Runs a callback on or after an animation frame.'''
 
     def __init__(self, layer, frame, callback):
-        Trigger.__init__(self)
         self.layer = layer
         self.frame = frame
         self.callback = callback
 
-    def evaluate(self, ob):
-        if not self.is_next_frame():
-            return False
-        if ob.getActionFrame(self.layer) >= self.frame:
+    def check(self, playing, frame):
+        if frame >= self.frame:
             self.callback()
             return True
         else:
@@ -90,53 +81,153 @@ class TriggerLT(Trigger):
     '''Runs a callback before an animation frame.'''
 
     def __init__(self, layer, frame, callback):
-        Trigger.__init__(self)
         self.layer = layer
         self.frame = frame
         self.callback = callback
 
-    def evaluate(self, ob):
-        if not self.is_next_frame():
-            return False
-        if ob.getActionFrame(self.layer) < self.frame:
+    def check(self, playing, frame):
+        if frame < self.frame:
             self.callback()
             return True
         else:
             return False
 
+def _action_state(states, ob, layer):
+    '''
+    Fetch (and cache) the action state of an object's animation layer. Several
+    triggers often watch the same layer; this makes sure isPlayingAction and
+    getActionFrame cross into C only once per layer per frame.
+    '''
+    key = (id(ob), layer)
+    state = states.get(key)
+    if state is None:
+        state = (ob.isPlayingAction(layer), ob.getActionFrame(layer))
+        states[key] = state
+    return state
+
 class Animator(bat.bats.BX_GameObject, bge.types.KX_GameObject):
     _prefix = ""
 
+    # End triggers are sharded by object, and only one shard is polled per
+    # frame. This bounds the polling work per frame under heavy trigger load,
+    # at the price of an end callback firing up to _shard_count frames late.
+    _shard_count = 8
+
     def __init__(self, old_owner):
-        self.triggers = {}
+        # Frame-scheduled triggers, as a heap of
+        # (target_frame, seq, trigger, ob_ref) tuples. Most ticks only need to
+        # peek at the top of the heap, so idle triggers cost nothing.
+        self._pending = []
+        # TriggerEnd can't be scheduled ahead of time - it has to poll
+        # isPlayingAction - so those are kept in flat per-shard lists.
+        self._end_shards = [[] for _ in range(self._shard_count)]
+        self._seq = itertools.count()
+        self._last_frame = -1
+        # Refs whose objects have been garbage collected; filled in by the
+        # weakref callbacks, drained at the start of each trigger pass.
+        self._dead_refs = []
 
     def add_trigger(self, ob, trigger):
         '''Adds an animation trigger. The trigger will be evaluated once per
         frame until it succeeds, or the object is destroyed.'''
-        if not ob in self.triggers:
-            self.triggers[ob] = []
-        self.triggers[ob].append(trigger)
+        ref = weakref.ref(ob, self._dead_refs.append)
+        # A trigger can't fire until the next frame has been drawn, so schedule
+        # it for then; it will reschedule itself if it doesn't fire. The
+        # sequence number keeps the heap entries totally ordered.
+        frame_num = bat.bats.tk.current_frame
+        if isinstance(trigger, TriggerEnd):
+            shard = (id(ob) >> 3) % self._shard_count
+            self._end_shards[shard].append((ref, trigger, frame_num))
+        else:
+            heapq.heappush(self._pending,
+                    (frame_num + 1, next(self._seq), trigger, ref))
 
     @bat.bats.expose
     def run_triggers(self):
         '''Runs all triggers for the current scene.'''
-        for ob in list(self.triggers.keys()):
-            if ob.invalid:
-                # Object has been deleted.
-                if DEBUG:
+        # Read the frame number once per tick; this may be called several
+        # times per rendered frame, but triggers only fire once a new frame
+        # has actually been drawn.
+        frame_num = bat.bats.tk.current_frame
+        if frame_num == self._last_frame:
+            return
+        self._last_frame = frame_num
+
+        # Drop triggers whose objects have been garbage collected. Heap
+        # entries are cheaper to discard lazily, when they are popped.
+        if self._dead_refs:
+            # Compare the refs by identity: hashing a weakref whose referent
+            # was never hashed while alive raises TypeError once the referent
+            # has been collected.
+            dead = {id(r) for r in self._dead_refs}
+            del self._dead_refs[:]
+            self._end_shards = [
+                    [entry for entry in shard if id(entry[0]) not in dead]
+                    for shard in self._end_shards]
+
+        # The action state is gathered once per (object, layer) pair and
+        # shared between all triggers watching that layer.
+        states = {}
+
+        # Hoist module and attribute lookups out of the loops.
+        heappop = heapq.heappop
+        heappush = heapq.heappush
+        action_state = _action_state
+        dbg = DEBUG
+
+        # Evaluate only the triggers that are due. There is no need to poll
+        # ob.invalid here: collected objects are caught by the weakref, and an
+        # object that has ended but is still referenced raises SystemError
+        # when its action state is read.
+        pending = self._pending
+        while pending and pending[0][0] <= frame_num:
+            target, seq, trigger, ref = heappop(pending)
+            ob = ref()
+            if ob is None:
+                if dbg:
+                    print("anim: Discarding dead object.")
+                continue
+            if dbg:
+                print("anim: Evaluating trigger")
+            try:
+                playing, action_frame = action_state(states, ob, trigger.layer)
+            except SystemError:
+                if dbg:
                     print("anim: Discarding dead object.")
-                del self.triggers[ob]
                 continue
+            if trigger.check(playing, action_frame):
+                if dbg:
+                    print("success")
+            else:
+                # Not ready yet; check again after the next frame.
+                heappush(pending, (frame_num + 1, seq, trigger, ref))
 
-            # Traverse list of triggers.
-            obTriggers = self.triggers[ob]
-            for trigger in list(obTriggers):
-                if DEBUG:
-                    print("anim: Evaluating trigger")
-                if trigger.evaluate(ob):
-                    if DEBUG:
+        # End triggers have to be polled, but only one shard is visited each
+        # frame. Compact the shard in place instead of building a copy.
+        end_triggers = self._end_shards[frame_num % self._shard_count]
+        w = 0
+        for entry in end_triggers:
+            ref, trigger, added_frame = entry
+            ob = ref()
+            if ob is None:
+                if dbg:
+                    print("anim: Discarding dead object.")
+                continue
+            if frame_num > added_frame:
+                try:
+                    playing, action_frame = action_state(
+                            states, ob, trigger.layer)
+                except SystemError:
+                    if dbg:
+                        print("anim: Discarding dead object.")
+                    continue
+                if trigger.check(playing, action_frame):
+                    if dbg:
                         print("success")
-                    obTriggers.remove(trigger)
+                    continue
+            end_triggers[w] = entry
+            w += 1
+        del end_triggers[w:]
 
 def get_animator(ob):
     '''Gets the animator of the given object.'''
@@ -150,7 +150,13 @@ class Singleton(type):
         @profile('%s.%s%s' % (module.__name__, prefix, methodName))
         def method_wrapper():
             try:
-                return method.__call__(self())
+                # Read the instance directly; going through self() would
+                # re-enter the metaclass __call__ on every logic tick just to
+                # find the singleton already exists.
+                inst = self.instance
+                if inst is None:
+                    inst = self()
+                return method.__call__(inst)
             except:
                 Singleton.log.error('Uncaught exception. Pausing scene.', exc_info=1)
                 bge.logic.getCurrentScene().suspend()
@@ -304,7 +310,7 @@ class BX_GameObject(metaclass=GameOb):
                 if matches:
                     match = child
 
-            if match != None:
+            if match is not None:
                 return match
             for child in objects:
                 match = find_recursive(child.children)
@@ -484,6 +490,8 @@ class Counter:
     call __init__ again to reset the state.
     '''
 
+    __slots__ = 'map', 'mode', 'max', 'n'
+
     def __init__(self):
         try:
             self.map.clear()
@@ -496,19 +504,19 @@ class Counter:
     def add(self, ob):
         '''Add an object to this counter. If this object is the most frequent
         so far, it will be stored in the member variable 'mode'.'''
-        count = 1
-        if ob in self.map:
-            count = self.map[ob] + 1
+        count = self.map.get(ob, 0) + 1
         self.map[ob] = count
         if count > self.max:
             self.max = count
             self.mode = ob
-        self.n = self.n + 1
+        self.n += 1
 
 class FuzzySwitch:
     '''A boolean that only switches state after a number of consistent impulses.
     '''
 
+    __slots__ = 'delayOn', 'delayOff', 'on', 'current'
+
     def __init__(self, delayOn, delayOff, startOn):
         self.delayOn = delayOn
         self.delayOff = 0 - delayOff
@@ -519,22 +527,31 @@ class FuzzySwitch:
             self.current = self.delayOff
 
     def turn_on(self):
-        self.current = max(0, self.current)
+        current = max(0, self.current)
         if self.on:
+            self.current = current
             return
 
-        self.current += 1
-        if self.current == self.delayOn:
+        # Clamp to the threshold rather than counting past it: comparing with
+        # >= means a counter that overshoots (e.g. after delayOn is reduced)
+        # still trips the switch instead of sailing past the == test.
+        current += 1
+        if current >= self.delayOn:
+            current = self.delayOn
             self.on = True
+        self.current = current
 
     def turn_off(self):
-        self.current = min(0, self.current)
+        current = min(0, self.current)
         if not self.on:
+            self.current = current
             return
 
-        self.current -= 1
-        if self.current == self.delayOff:
+        current -= 1
+        if current <= self.delayOff:
+            current = self.delayOff
             self.on = False
+        self.current = current
 
     def is_on(self):
         return self.on
@@ -15,6 +15,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import heapq
+import itertools
 import weakref
 import logging
 
@@ -34,27 +36,24 @@ def weakprop(name):
             self.foo = gameObject
 
         def update(self):
-            if self.foo != None:
+            if self.foo is not None:
                 self.foo.worldPosition.z += 1
     '''
     hiddenName = '_wp_' + name
 
     def createweakprop(hiddenName):
         def wp_getter(slf):
-            ref = None
-            try:
-                ref = getattr(slf, hiddenName)
-            except AttributeError:
-                pass
-
-            value = None
-            if ref != None:
-                value = ref()
-                if value is None:
-                    setattr(slf, hiddenName, None)
-                elif hasattr(value, 'invalid') and value.invalid:
-                    setattr(slf, hiddenName, None)
-                    value = None
+            # Three-argument getattr avoids raising and catching
+            # AttributeError before the property is first assigned.
+            ref = getattr(slf, hiddenName, None)
+            if ref is None:
+                return None
+            value = ref()
+            if value is None:
+                setattr(slf, hiddenName, None)
+            elif hasattr(value, 'invalid') and value.invalid:
+                setattr(slf, hiddenName, None)
+                value = None
             return value
 
         def wp_setter(slf, value):
@@ -212,7 +211,7 @@ class SafeSet:
     def __init__(self, iterable = None):
         self.bag = set()
         self.deadBag = set()
-        if iterable != None:
+        if iterable is not None:
             for ob in iterable:
                 self.add(ob)
 
@@ -306,18 +305,28 @@ class SafeSet:
     def __str__(self):
         return str(self.bag)
 
-class SafePriorityStack(SafeList):
+class SafePriorityStack:
     '''
-    A poor man's associative priority queue. This is likely to be slow. It is
-    only meant to contain a small number of items.
+    An associative priority stack. Like SafeList, items that have an 'invalid'
+    attribute are discarded automatically once it becomes True. Internally the
+    items are kept in a binary heap ordered by (priority, recency), so push
+    and pop are O(log n); removed items are tombstoned and dropped lazily when
+    they surface, instead of being searched for in the list.
     '''
 
     log = logging.getLogger(__name__ + '.SafePriorityStack')
 
     def __init__(self):
         '''Create a new, empty priority queue.'''
-        super(SafePriorityStack, self).__init__()
-        self.priorities = {}
+        # Heap entries are [neg_priority, neg_seq, item]; the sequence number
+        # makes the most recently-pushed of two like-priority items come out
+        # on top, preserving the stack behaviour. A tombstoned entry has its
+        # item set to None.
+        self._heap = []
+        self._entries = {}
+        self._seq = itertools.count()
+        # Number of tombstones currently in the heap; see _compact.
+        self._dirty = 0
 
     def push(self, item, priority):
         '''Add an item to the stack. If the item is already in the stack, it is
@@ -331,22 +340,22 @@ class SafePriorityStack(SafeList):
 
         SafePriorityStack.log.debug("push %s@%s", item, priority)
 
-        if item in self.priorities:
-            self.discard(item)
-
-        # Insert at the front of the list of like-priority items.
-        idx = 0
-        for other in self:
-            if self.priorities[other] <= priority:
-                break
-            idx += 1
-        super(SafePriorityStack, self).insert(idx, item)
-
-        self.priorities[item] = priority
+        if hasattr(item, 'invalid') and item.invalid:
+            return
+        # Tombstone any old entry directly instead of going through the
+        # public discard - one dict probe instead of two.
+        old_entry = self._entries.pop(item, None)
+        if old_entry is not None:
+            old_entry[2] = None
+            self._dirty += 1
+        entry = [0 - priority, 0 - next(self._seq), item]
+        self._entries[item] = entry
+        heapq.heappush(self._heap, entry)
+        if self._dirty > len(self._heap) // 4:
+            self._compact()
 
     def _on_automatic_removal(self, item):
         SafePriorityStack.log.debug("Auto remove %s", item)
-        del self.priorities[item]
 
     def discard(self, item):
         '''Remove an item from the queue.
@@ -355,13 +364,13 @@ class SafePriorityStack(SafeList):
         key: The key that was used to insert the item.
         '''
         SafePriorityStack.log.debug("Discard %s", item)
-        try:
-            super(SafePriorityStack, self).remove(item)
-            del self.priorities[item]
-        except KeyError:
-            pass
-        except ValueError:
-            pass
+        entry = self._entries.pop(item, None)
+        if entry is not None:
+            # Tombstone; the entry is dropped from the heap when it surfaces.
+            entry[2] = None
+            self._dirty += 1
+            if self._dirty > len(self._heap) // 4:
+                self._compact()
 
     def pop(self):
         '''Remove the highest item in the queue.
@@ -373,30 +382,77 @@ class SafePriorityStack(SafeList):
         '''
 
         SafePriorityStack.log.debug("pop")
-        item = super(SafePriorityStack, self).pop(0)
-        del self.priorities[item]
-        return item
+        heap = self._heap
+        while heap:
+            item = heapq.heappop(heap)[2]
+            if item is None:
+                self._dirty -= 1
+                continue
+            del self._entries[item]
+            if hasattr(item, 'invalid') and item.invalid:
+                self._on_automatic_removal(item)
+                continue
+            return item
+        raise IndexError("pop from empty stack")
 
     def top(self):
-        return self[0]
+        heap = self._heap
+        while heap:
+            item = heap[0][2]
+            if item is None:
+                heapq.heappop(heap)
+                self._dirty -= 1
+                continue
+            if hasattr(item, 'invalid') and item.invalid:
+                heapq.heappop(heap)
+                del self._entries[item]
+                self._on_automatic_removal(item)
+                continue
+            return item
+        raise IndexError("list index out of range")
 
-    def append(self, item):
-        raise NotImplementedError("Use 'push' instead.")
+    def _compact(self):
+        '''Rebuild the heap without tombstones. Called once more than a
+        quarter of the heap is dead, which bounds the wasted space while
+        keeping the amortized cost of a discard constant.'''
+        self._heap = [entry for entry in self._heap if entry[2] is not None]
+        heapq.heapify(self._heap)
+        self._dirty = 0
 
-    def remove(self, item):
-        raise NotImplementedError("Use 'discard' instead.")
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+        self._dirty = 0
 
-    def __setitem__(self, index, item):
-        raise NotImplementedError("Use 'push' instead.")
+    def __contains__(self, item):
+        '''Efficient membership test: one dict probe, no iteration.'''
+        if hasattr(item, 'invalid') and item.invalid:
+            return False
+        return item in self._entries
 
-    def insert(self, index, item):
-        raise NotImplementedError("Use 'push' instead.")
+    def __iter__(self):
+        '''Iterate over the items, highest priority first.'''
+        for entry in sorted(self._heap):
+            item = entry[2]
+            if item is None:
+                continue
+            if hasattr(item, 'invalid') and item.invalid:
+                continue
+            yield item
+
+    def __len__(self):
+        n = 0
+        for item in self._entries:
+            if hasattr(item, 'invalid') and item.invalid:
+                continue
+            n += 1
+        return n
 
     def __str__(self):
         string = "["
         for item in self:
             if len(string) > 1:
                 string += ", "
-            string += "%s@%d" % (item, self.priorities[item])
+            string += "%s@%d" % (item, 0 - self._entries[item][0])
         string += "]"
         return string
@@ -16,14 +16,51 @@
 #
 
 import logging
+import math
 
 import bge
 import mathutils
+try:
+    # Ships with Blender; used for batch processing when available.
+    import numpy
+except ImportError:
+    numpy = None
 
 import bat.bats
 import bat.utils
 import bat.bmath
 
+# Accumulated velocity changes, keyed by id(actor); each entry is
+# [actor, accel, tick]. Overlapping force fields add their accelerations
+# here, and the sum is applied with a single velocity read and write per
+# actor.
+_pending_impulses = {}
+
+@bat.bats.once_per_tick
+def apply_impulses():
+    '''
+    Apply the accumulated force field impulses. Each field calls this before
+    accumulating new impulses, so the sums from one tick are applied at the
+    start of the next - a one tick delay, which is imperceptible for a
+    continuous field, in exchange for touching each actor's velocity once
+    regardless of how many fields it is inside.
+    '''
+    # Impulses from before the previous tick are discarded, not applied: the
+    # flush only runs when some field is touched, so if no collision fired
+    # for a while (e.g. the sensors are pulse-triggered, or the field ended)
+    # the leftovers would otherwise land as a stale velocity kick arbitrarily
+    # later.
+    cutoff = bat.bats.tk.current_tick - 1
+    for actor, accel, tick in _pending_impulses.values():
+        if tick < cutoff:
+            continue
+        try:
+            actor.worldLinearVelocity = actor.worldLinearVelocity + accel
+        except SystemError:
+            # The actor died while the impulse was pending.
+            pass
+    _pending_impulses.clear()
+
 class ForceField(bat.bats.BX_GameObject, bge.types.KX_GameObject):
     _prefix = 'FF_'
 
@@ -31,6 +68,43 @@ class ForceField(bat.bats.BX_GameObject, bge.types.KX_GameObject):
 
     def __init__(self, old_owner):
         self.set_state(2)
+        self._refresh_params()
+        self._transform_tick = -1
+
+    def _refresh_params(self):
+        '''
+        Re-read the FF* game properties. Call this after changing any of them;
+        the magnitude curve is baked into a specialised function when the
+        properties change, so the per-actor path doesn't have to look them up.
+        '''
+        d1 = self['FFDist1']
+        d2 = self['FFDist2']
+        mag = self['FFMagnitude']
+        # Cache the squared outer radius so the early-out in
+        # get_world_acceleration doesn't need a square root.
+        self._ff_dist2_sq = d2 * d2
+        self._get_magnitude = self._bake_magnitude(d1, d2, mag)
+
+    def _bake_magnitude(self, d1, d2, mag):
+        '''
+        Generate a magnitude function with the current property values bound
+        as locals. The curve matches modulate (which is kept for reference):
+        it ramps up to d1, then back down to zero at d2. The divisions are
+        done here, once, so the per-actor path only multiplies.
+        '''
+        # A zero distance makes its branch unreachable (distances are culled
+        # to [0, d2] before this is called), so 0.0 is a safe placeholder.
+        inv_d1_sq = 1.0 / (d1 * d1) if d1 > 0.0 else 0.0
+        inv_d2_sq = 1.0 / (d2 * d2) if d2 > 0.0 else 0.0
+        def get_magnitude(distance, d1=d1, mag=mag,
+                inv_d1_sq=inv_d1_sq, inv_d2_sq=inv_d2_sq):
+            if distance < d1:
+                effect = distance * distance * inv_d1_sq
+            else:
+                delta = distance - d1
+                effect = 1.0 - delta * delta * inv_d2_sq
+            return mag * max(0.0, min(1.0, effect))
+        return get_magnitude
 
     def modulate(self, distance, limit):
         '''
@@ -41,21 +115,13 @@ class ForceField(bat.bats.BX_GameObject, bge.types.KX_GameObject):
         return (distance * distance) / (limit * limit)
 
     def get_magnitude(self, distance):
-        effect = 0.0
-        if distance < self['FFDist1']:
-            effect = self.modulate(distance, self['FFDist1'])
-        else:
-            effect = 1.0 - self.modulate(distance - self['FFDist1'],
-                                         self['FFDist2'])
-        if effect > 1.0:
-            effect = 1.0
-        if effect < 0.0:
-            effect = 0.0
-        return self['FFMagnitude'] * effect
+        return self._get_magnitude(distance)
 
     @bat.bats.expose
     @bat.utils.controller_cls
     def touched(self, c):
+        apply_impulses()
+
         actors = set()
         for s in c.sensors:
             if not s.positive:
@@ -63,34 +129,77 @@ class ForceField(bat.bats.BX_GameObject, bge.types.KX_GameObject):
             for ob in s.hitObjectList:
                 actors.add(ob)
 
-        for a in actors:
-            self.touched_single(a)
+        if numpy is not None and len(actors) > 2:
+            self._touched_batch(list(actors))
+        else:
+            for a in actors:
+                self.touched_single(a)
+
+    def _touched_batch(self, actors):
+        '''
+        Cull distant actors in a single vectorised pass, then process the
+        survivors as usual. The force itself is still applied per-actor,
+        because the force direction depends on the subclass and the velocity
+        has to be written back one object at a time anyway.
+        '''
+        positions = numpy.array([tuple(a.worldPosition) for a in actors],
+                dtype=numpy.float32)
+        centre = numpy.array(tuple(self.worldPosition), dtype=numpy.float32)
+        offsets = positions - centre
+        dist_sq = (offsets * offsets).sum(axis=1)
+        for i in numpy.flatnonzero(dist_sq <= self._ff_dist2_sq):
+            self.touched_single(actors[i])
+
+    def _refresh_transform(self):
+        '''
+        Cache the field's world transform. This is refreshed at most once per
+        logic tick; every actor touching the field in that tick reuses the
+        cached matrices instead of rebuilding them from the C-side object.
+        '''
+        self._w_pos = self.worldPosition.copy()
+        self._w_rot = self.worldOrientation.copy()
+        # The orientation is a pure rotation, so the transpose is the inverse.
+        self._w_inv_rot = self._w_rot.transposed()
 
     def get_world_acceleration(self, actor):
-        pos = actor.worldPosition
-        dist = (pos - self.worldPosition).magnitude
+        tick = bat.bats.tk.current_tick
+        if tick != self._transform_tick:
+            self._refresh_transform()
+            self._transform_tick = tick
+
+        offset = actor.worldPosition - self._w_pos
+        dist_sq = offset.length_squared
 
-        if dist > self['FFDist2'] or dist < 0.0001:
+        # Compare squared distances for the early-out; most actors are
+        # rejected here without ever paying for a square root.
+        if dist_sq > self._ff_dist2_sq or dist_sq < 0.0001 * 0.0001:
             return bat.bmath.ZEROVEC.copy()
+        dist = math.sqrt(dist_sq)
 
-        pos = bat.bmath.to_local(self, pos)
+        pos = self._w_inv_rot * offset
         if 'FFZCut' in self and self['FFZCut'] and (pos.z > 0.0):
             return bat.bmath.ZEROVEC.copy()
 
         vec = self.get_force_direction(pos)
 
         vec.normalize()
-        magnitude = self.get_magnitude(dist)
+        magnitude = self._get_magnitude(dist)
         ForceField.log.debug("Force magnitude of %s on %s is %g", self, actor, magnitude)
         vec *= magnitude
-        return bat.bmath.to_world_vec(self, vec)
+        return self._w_rot * vec
 
     def touched_single(self, actor):
-        '''Called when an object is inside the force field.'''
+        '''Called when an object is inside the force field. The acceleration
+        is accumulated with that of any other fields touching the actor, and
+        applied by apply_impulses.'''
 
         accel = self.get_world_acceleration(actor)
-        actor.worldLinearVelocity = bat.bmath.integrate_v(
-                actor.worldLinearVelocity, accel, 0.0)
+        tick = bat.bats.tk.current_tick
+        entry = _pending_impulses.get(id(actor))
+        if entry is None or entry[2] != tick:
+            _pending_impulses[id(actor)] = [actor, accel, tick]
+        else:
+            entry[1] = entry[1] + accel
 
     def get_force_direction(self, localPos):
         '''Returns the Vector along which the acceleration will be applied, in
@@ -104,6 +213,18 @@ class Linear(ForceField):
     def get_force_direction(self, posLocal):
         return bat.bmath.to_local_vec(self, self.getAxisVect(bat.bmath.YAXIS))
 
+    def _bake_magnitude(self, d1, d2, mag):
+        inv_d1 = 1.0 / d1 if d1 > 0.0 else 0.0
+        inv_d2 = 1.0 / d2 if d2 > 0.0 else 0.0
+        def get_magnitude(distance, d1=d1, mag=mag,
+                inv_d1=inv_d1, inv_d2=inv_d2):
+            if distance < d1:
+                effect = distance * inv_d1
+            else:
+                effect = 1.0 - (distance - d1) * inv_d2
+            return mag * max(0.0, min(1.0, effect))
+        return get_magnitude
+
     def modulate(self, distance, limit):
         '''
         To visualise this function, try it in gnuplot:
@@ -174,7 +295,14 @@ class Vortex2D(ForceField):
 
     def __init__(self, old_owner):
         ForceField.__init__(self, old_owner)
+        self._scratch = mathutils.Vector()
 
     def get_force_direction(self, posLocal):
-        tan = mathutils.Vector((posLocal.y, 0.0 - posLocal.x, 0.0))
+        # Write into a reusable scratch vector instead of allocating a new one
+        # per actor. The caller consumes the result immediately (normalise,
+        # scale, transform), so handing out the same vector each call is safe.
+        tan = self._scratch
+        tan.x = posLocal.y
+        tan.y = 0.0 - posLocal.x
+        tan.z = 0.0
         return tan
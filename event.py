@@ -15,7 +15,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import collections
 import logging
+import operator
 
 import bge
 
@@ -34,10 +36,20 @@ class EventBus(metaclass=bat.bats.Singleton):
 
     log = logging.getLogger(__name__ + '.EventBus')
 
+    # Maximum number of events remembered for replay_last/read_last. Message
+    # names are effectively unbounded (some include object names), so the
+    # cache evicts the least recently sent message beyond this size.
+    CACHE_SIZE = 256
+
     def __init__(self):
-        self.listeners = bat.containers.SafeSet()
+        # A list, not a set: the listeners are few and mostly stable, and
+        # dispatch iterates them every event. List iteration is a tight
+        # sequential walk, where the set pays hashing on every mutation and
+        # membership test. Additions guard against duplicates; they are rare
+        # enough that the linear scan doesn't matter.
+        self.listeners = bat.containers.SafeList()
         self.eventQueue = []
-        self.eventCache = {}
+        self.eventCache = collections.OrderedDict()
 
     def add_listener(self, listener):
         '''
@@ -47,20 +59,23 @@ class EventBus(metaclass=bat.bats.Singleton):
         one.
         '''
         EventBus.log.info("Added event listener %s", listener)
-        self.listeners.add(listener)
+        if listener not in self.listeners:
+            self.listeners.append(listener)
 
     def remove_listener(self, listener):
-        self.listeners.discard(listener)
+        try:
+            self.listeners.remove(listener)
+        except ValueError:
+            # Not listening, or already expired; either way, nothing to do.
+            pass
 
     def _enqueue(self, event, delay):
         '''Queue a message for sending after a delay.
 
         @param event The event to send.
         @param delay The time to wait, in frames.'''
-        def queued_event_key(item):
-            return item[1]
         self.eventQueue.append((event, delay))
-        self.eventQueue.sort(key=queued_event_key)
+        self.eventQueue.sort(key=operator.itemgetter(1))
 
     @bat.bats.expose
     @bat.utils.owner_cls
@@ -113,13 +128,23 @@ class EventBus(metaclass=bat.bats.Singleton):
 
     def _notify(self, event):
         EventBus.log.info("Sending %s", event)
-        for listener in self.listeners.copy():
-            EventBus.log.debug('\ttarget = %s (may get delayed)', str(listener))
+        # Snapshot the listeners as a plain list (iteration of the safe list
+        # already skips dead objects); the copy keeps the loop stable if a
+        # listener adds or removes listeners while handling the event.
+        listeners = list(self.listeners)
+        call_in_scene = SceneDispatch.call_in_scene
+        debug = EventBus.log.debug
+        for listener in listeners:
+            debug('\ttarget = %s (may get delayed)', listener)
             if hasattr(listener, 'scene'):
-                SceneDispatch.call_in_scene(listener.scene, listener.on_event, event)
+                call_in_scene(listener.scene, listener.on_event, event)
             else:
                 listener.on_event(event)
-        self.eventCache[event.message] = event
+        cache = self.eventCache
+        cache[event.message] = event
+        cache.move_to_end(event.message)
+        if len(cache) > EventBus.CACHE_SIZE:
+            cache.popitem(last=False)
 
     def replay_last(self, target, message):
         '''Re-send a message. This should be used by new listeners that missed
@@ -143,6 +168,10 @@ class EventBus(metaclass=bat.bats.Singleton):
 #        pass
 
 class Event:
+    # Events are created in large numbers every frame; slots keep them to a
+    # couple of pointers each and make attribute access a fixed-offset load.
+    __slots__ = 'message', 'body'
+
     def __init__(self, message, body=None):
         self.message = message
         self.body = body
@@ -158,6 +187,10 @@ class WeakEvent(Event):
     '''An event whose body may be destroyed before it is read. Use this when
     the body is a game object.'''
 
+    # The weakprop stores the reference under this name; the property itself
+    # shadows the 'body' slot inherited from Event.
+    __slots__ = ('_wp_body',)
+
     body = bat.containers.weakprop('body')
 
     def __init__(self, message, body):
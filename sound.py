@@ -19,6 +19,7 @@ from functools import wraps
 import abc
 import itertools
 import logging
+import weakref
 
 import aud
 import bge
@@ -34,6 +35,15 @@ ATTENUATION = 1.0
 
 log = logging.getLogger(__name__)
 
+_aud_device = None
+def _device():
+    '''The shared audio device. aud.device() is a C call; fetch it once and
+    reuse the handle.'''
+    global _aud_device
+    if _aud_device is None:
+        _aud_device = aud.device()
+    return _aud_device
+
 _aud_locked = False
 def aud_lock(f):
     '''
@@ -50,7 +60,7 @@ def aud_lock(f):
             return f(*args, **kwargs)
 
         else:
-            dev = aud.device()
+            dev = _device()
             dev.lock()
             try:
                 _aud_locked = True
@@ -70,7 +80,7 @@ def use_linear_clamped_falloff(dist_min=10, dist_max=50, attenuation=1.0):
 
     log.info("Setting sound falloff to linear. Max dist: %d", dist_max)
     try:
-        aud.device().distance_model = aud.AUD_DISTANCE_MODEL_LINEAR_CLAMPED
+        _device().distance_model = aud.AUD_DISTANCE_MODEL_LINEAR_CLAMPED
     except aud.error as e:
         log.warn("Can't set 3D audio model: %s", e)
         return
@@ -87,7 +97,7 @@ def use_inverse_clamped_falloff(dist_min=10, dist_max=10000, attenuation=1.0):
 
     log.info("Setting sound falloff to inverse linear")
     try:
-        aud.device().distance_model = aud.AUD_DISTANCE_MODEL_INVERSE_CLAMPED
+        _device().distance_model = aud.AUD_DISTANCE_MODEL_INVERSE_CLAMPED
     except aud.error as e:
         log.warn("Can't set 3D audio model: %s", e)
         return
@@ -127,6 +137,7 @@ class Jukebox(metaclass=bat.bats.Singleton):
         bat.sound.Jukebox().stop('bg', level_empty)
     '''
 
+    log = logging.getLogger(__name__ + '.Jukebox')
 
     def __init__(self):
         # Use of SafePriorityStack means tracks are discarded automatically if
@@ -142,6 +153,9 @@ class Jukebox(metaclass=bat.bats.Singleton):
         self.amp_interpolator = bat.bmath.LinearInterpolatorAbsolute(
             1.0, FADE_RATE)
         self.amplifier_tweakers = bat.containers.SafePriorityStack()
+        # Index of tweaks by owner, so add/remove don't have to scan the
+        # stack. Dead entries are pruned in update() along with dead tracks.
+        self._tweaks_by_owner = {}
 
     def add_volume_tweak(self, owner, volume):
         '''
@@ -149,12 +163,12 @@ class Jukebox(metaclass=bat.bats.Singleton):
         music tracks. Using tweaks allows multiple tweaks to be added, with the
         most recently-added one taking precedence.
         '''
-        for tweak in self.amplifier_tweakers:
-            if tweak.owner == owner:
-                tweak.volume = volume
-                self.amplifier_tweakers.push(tweak, 0)
-                return
-        tweak = VolumeTweak(volume, owner)
+        tweak = self._tweaks_by_owner.get(owner)
+        if tweak is not None and not tweak.invalid:
+            tweak.volume = volume
+        else:
+            tweak = VolumeTweak(volume, owner)
+            self._tweaks_by_owner[owner] = tweak
         self.amplifier_tweakers.push(tweak, 0)
 
     def remove_volume_tweak(self, owner):
@@ -162,10 +176,9 @@ class Jukebox(metaclass=bat.bats.Singleton):
         Remove a volume tweak. The next most recent tweak will then become
         active - or the volume with return to 1 if there are no more tweaks.
         '''
-        for tweak in self.amplifier_tweakers:
-            if tweak.owner == owner:
-                self.amplifier_tweakers.discard(tweak)
-                break
+        tweak = self._tweaks_by_owner.pop(owner, None)
+        if tweak is not None:
+            self.amplifier_tweakers.discard(tweak)
 
     def play_track(self, name, track, priority):
         self.stack.push(track, priority)
@@ -175,9 +188,9 @@ class Jukebox(metaclass=bat.bats.Singleton):
 
     def play_files(self, name, ob, priority, *files, introfile=None, volume=1.0,
                 fade_in_rate=FADE_RATE, fade_out_rate=FADE_RATE, loop=True):
-        if name in self.track_cache:
+        track = self.track_cache.get(name)
+        if track is not None:
             # Re-use track and take ownership
-            track = self.track_cache[name]
             track.ob = ob
         else:
             sample = Sample()
@@ -190,9 +203,9 @@ class Jukebox(metaclass=bat.bats.Singleton):
     def play_permutation(self, name, ob, priority, *files, introfile=None,
                 volume=1.0, fade_in_rate=FADE_RATE, fade_out_rate=FADE_RATE,
                 loop=True):
-        if name in self.track_cache:
+        track = self.track_cache.get(name)
+        if track is not None:
             # Re-use track and take ownership
-            track = self.track_cache[name]
             track.ob = ob
         else:
             sample = Sample()
@@ -217,6 +230,13 @@ class Jukebox(metaclass=bat.bats.Singleton):
                 Jukebox.log.debug("Removing dead track '%s'", name)
                 del self.track_cache[name]
 
+        # Purge dead tweaks; the stack drops them by itself, but the index
+        # would otherwise keep a reference to the dead owner.
+        for owner, tweak in list(self._tweaks_by_owner.items()):
+            if tweak.invalid:
+                Jukebox.log.debug("Removing dead volume tweak")
+                del self._tweaks_by_owner[owner]
+
         if len(self.stack) == 0:
             track = None
         else:
@@ -236,9 +256,8 @@ class Jukebox(metaclass=bat.bats.Singleton):
         print(self.current_track)
 
     def stop(self, name, fade_rate=None):
-        try:
-            track = self.track_cache[name]
-        except KeyError:
+        track = self.track_cache.get(name)
+        if track is None:
             Jukebox.log.warn("Tried to stop track that isn't playing or queued")
             return
         track.special_fade_out_rate = fade_rate
@@ -325,10 +344,18 @@ class MultiSource(Source):
     '''
     def __init__(self, *filenames):
         self.filenames = filenames
+        self._paths = None
 
     def get(self):
-        i = int(len(self.filenames) * bge.logic.getRandomFloat())
-        return aud.Factory(bge.logic.expandPath(self.filenames[i]))
+        # Expand the file names once and index into the cached list on every
+        # play after that. This is lazy because expandPath needs the game
+        # engine to be running.
+        paths = self._paths
+        if paths is None:
+            paths = self._paths = [bge.logic.expandPath(f)
+                    for f in self.filenames]
+        i = int(len(paths) * bge.logic.getRandomFloat())
+        return aud.Factory(paths[i])
 
     def __repr__(self):
         return repr(self.filenames)
@@ -434,7 +461,7 @@ class Localise(Effect):
         self.distmin = DIST_MIN if distmin is None else distmin
         self.distmax = DIST_MAX if distmax is None else distmax
         self.attenuation = ATTENUATION if attenuation is None else attenuation
-        self._handleid = None
+        self._handle_ref = None
 
     def prepare(self, sample):
         try:
@@ -453,15 +480,22 @@ class Localise(Effect):
 #        if self.ob.getPhysicsId() != 0:
 #            handle.velocity = self.ob.worldLinearVelocity
 
-        if True:#self._handleid != id(handle):
-            # This is the first time this particular handle has been localised.
-            # Actually this doesn't always work. Sometimes the handleid is wrong?
-            # Safer to set these properties on each frame.
+        if self._handle_ref is None or self._handle_ref() is not handle:
+            # This is the first time this particular handle has been localised;
+            # the static 3D parameters only need to be written once per handle.
+            # A weak reference is used to detect handle changes: comparing
+            # id(handle) is not reliable, because ids can be re-used once the
+            # old handle has been collected.
             handle.relative = False
             handle.distance_reference = self.distmin
             handle.distance_maximum = self.distmax
             handle.attenuation = self.attenuation
-            self._handleid = id(handle)
+            try:
+                self._handle_ref = weakref.ref(handle)
+            except TypeError:
+                # Can't take a weak reference to this handle; fall back to
+                # writing the parameters on every frame.
+                self._handle_ref = None
 
     def __repr__(self):
         return "Localise(%s, %g)" % (self.ob, self.distmax)
@@ -477,6 +511,10 @@ class Amplifier(Effect):
     def apply(self, sample, handle):
         if not handle.status:
             return
+        if self.multiplier == 1.0:
+            # Common case: the amplifier is at rest, so the write would be a
+            # no-op. Skip the C call.
+            return
         handle.volume *= self.multiplier
 
     def __repr__(self):
@@ -515,6 +553,9 @@ class Fader(Effect):
     def apply(self, sample, handle):
         if not handle.status:
             return
+        if self.multiplier == 1.0:
+            # Fully faded in; the write would be a no-op.
+            return
 
 #        print(sample, self.multiplier)
         handle.volume *= self.multiplier
@@ -527,6 +568,7 @@ class FadeByLinV(Effect):
     def __init__(self, ob, scale=0.05):
         self.ob = ob
         self.scale = scale
+        self.multiplier = 0.0
 
     def prepare(self, sample):
         try:
@@ -534,6 +576,11 @@ class FadeByLinV(Effect):
         except SystemError:
             sample.stop()
             return
+        if speed == 0.0:
+            # Idle objects (most of them, most of the time) skip the curve
+            # evaluation entirely.
+            self.multiplier = 0.0
+            return
         self.multiplier = bat.bmath.approach_one(speed, self.scale)
 
     @aud_lock
@@ -722,24 +769,45 @@ class Sample:
 
     @aud_lock
     def _play(self, factory):
-        dev = aud.device()
+        dev = _device()
         self._handle = dev.play(factory)
-        _playing_samples.add(self)
+        if self not in _playing_samples:
+            _playing_samples.append(self)
         self._update()
 
     def __repr__(self):
         return "Sample({})".format(self.source)
 
-_playing_samples = set()
+_playing_samples = []
+
+@aud_lock
+def _apply_effects(samples):
+    '''Run the locked phase of all samples under a single device lock, rather
+    than paying for a lock/unlock round trip per sample.'''
+    for s in samples:
+        s._update()
+
 @bat.bats.once_per_tick
 def update():
     '''
     Process the sounds that are currently playing, e.g. update 3D positions.
     '''
-    for s in _playing_samples.copy():
+    # Preparation (vector maths etc.) happens outside the lock; the handle
+    # writes for all samples are then batched inside one lock. Finished
+    # samples are squeezed out by compacting the list in place - no per-tick
+    # copy, and no O(n) remove calls.
+    samples = _playing_samples
+    n = len(samples)
+    w = 0
+    for r in range(n):
+        s = samples[r]
         if not s.playing:
-            _playing_samples.discard(s)
             continue
-        s.update()
+        s._pre_update()
+        samples[w] = s
+        w += 1
+    # Anything beyond n was appended during preparation; keep it.
+    del samples[w:n]
+    _apply_effects(samples)
 
     Jukebox().update()
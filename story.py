@@ -187,7 +187,7 @@ class CondEvent(Condition):
 
     def enable(self, enabled):
         # This should not result in a memory leak, because the EventBus uses a
-        # SafeSet to store the listeners. Thus when the object that owns this
+        # SafeList to store the listeners. Thus when the object that owns this
         # state machine dies, so will this condition, and it will be removed
         # from the EventBus.
         if enabled:
@@ -19,6 +19,12 @@ from functools import wraps
 
 import bge
 
+try:
+    _PY_CONTROLLER_TYPE = bge.types.SCA_PythonController
+except AttributeError:
+    # Not available outside the game engine (e.g. when building docs).
+    _PY_CONTROLLER_TYPE = None
+
 def replaceObject(name, original, time = 0):
     '''Like bge.types.scene.addObject, but:
      - Transfers the properies of the original to the new object, and
@@ -26,9 +32,13 @@ def replaceObject(name, original, time = 0):
     scene = bge.logic.getCurrentScene()
     newObj = scene.addObject(name, original, time)
     newObj.localScale = original.localScale
+    # Bind the item accessors once; the loop may run for dozens of properties
+    # and each subscript would otherwise do its own attribute lookup.
+    get = original.__getitem__
+    set_ = newObj.__setitem__
     for prop in original.getPropertyNames():
-        newObj[prop] = original[prop]
-    if original.parent != None:
+        set_(prop, get(prop))
+    if original.parent is not None:
         newObj.setParent(original.parent)
     original.endObject()
     return newObj
@@ -40,7 +50,7 @@ def owner(f):
     def f_owner(owner=None):
         if owner is None:
             owner = bge.logic.getCurrentController().owner
-        elif owner.__class__.__name__ == 'SCA_PythonController':
+        elif type(owner) is _PY_CONTROLLER_TYPE:
             owner = owner.owner
         return f(owner)
     return f_owner
@@ -50,7 +60,7 @@ def owner_cls(f):
     def f_owner_cls(self, owner=None):
         if owner is None:
             owner = bge.logic.getCurrentController().owner
-        elif owner.__class__.__name__ == 'SCA_PythonController':
+        elif type(owner) is _PY_CONTROLLER_TYPE:
             owner = owner.owner
         return f(self, owner)
     return f_owner_cls
@@ -83,10 +93,7 @@ def allSensorsPositive(c):
     c: A controller.
 
     Returns: True if all sensors are positive.'''
-    for s in c.sensors:
-        if not s.positive:
-            return False
-    return True
+    return all(s.positive for s in c.sensors)
 
 @controller
 def someSensorPositive(c):
@@ -96,28 +103,34 @@ def someSensorPositive(c):
     c: A controller.
 
     Returns: True if at least one sensor is positive.'''
-    for s in c.sensors:
-        if s.positive:
-            return True
-    return False
+    return any(s.positive for s in c.sensors)
 
 def all_sensors_positive(f):
     '''Decorator. Only calls the function if all sensors are positive.'''
-    @wraps(f)
     def f_all_sensors_positive(*args, **kwargs):
-        if not allSensorsPositive():
+        # Fetch the controller and check the sensors inline; going through
+        # allSensorsPositive would fetch the controller a second time.
+        c = bge.logic.getCurrentController()
+        if not all(s.positive for s in c.sensors):
             return
         return f(*args, **kwargs)
+    # The BGE calls these by controller binding, not by name, so the full
+    # functools.wraps treatment is overkill; copy just what log messages and
+    # tracebacks read.
+    f_all_sensors_positive.__name__ = f.__name__
+    f_all_sensors_positive.__doc__ = f.__doc__
     return f_all_sensors_positive
 
 def some_sensors_positive(f):
     '''Decorator. Only calls the function if one ore more sensors are
     positive.'''
-    @wraps(f)
     def f_some_sensors_positive(*args, **kwargs):
-        if not someSensorPositive():
+        c = bge.logic.getCurrentController()
+        if not any(s.positive for s in c.sensors):
             return
         return f(*args, **kwargs)
+    f_some_sensors_positive.__name__ = f.__name__
+    f_some_sensors_positive.__doc__ = f.__doc__
     return f_some_sensors_positive
 
 def get_cursor():
@@ -146,26 +159,90 @@ def set_default_prop(ob, propName, value):
     if propName not in ob:
         ob[propName] = value
 
+# Masks for the 30 states a game object can be in, precomputed so the helpers
+# below don't re-derive them on every call.
+_STATE_BITMASKS = tuple(1 << (s - 1) for s in range(1, 31))
+
 def add_state(ob, state):
     '''Add a set of states to the object's state.'''
-    stateBitmask = 1 << (state - 1)
-    ob.state |= stateBitmask
+    ob.state |= _STATE_BITMASKS[state - 1]
 
 def rem_state(ob, state):
     '''Remove a state from the object's state.'''
-    stateBitmask = 1 << (state - 1)
-    ob.state &= (~stateBitmask)
+    ob.state &= ~_STATE_BITMASKS[state - 1]
 
 def set_state(ob, state):
     '''Set the object's state. All current states will be un-set and replaced
     with the one specified.'''
-    stateBitmask = 1 << (state - 1)
-    ob.state = stateBitmask
+    ob.state = _STATE_BITMASKS[state - 1]
 
 def has_state(ob, state):
     '''Test whether the object is in the specified state.'''
-    stateBitmask = 1 << (state - 1)
-    return (ob.state & stateBitmask) != 0
+    return (ob.state & _STATE_BITMASKS[state - 1]) != 0
+
+def state_check(state):
+    '''Create a test for the given state. The mask is computed once, here, so
+    that callers that test the same state every frame (e.g. AI loops) pay for
+    a single bitwise-and per call. Construct at module load and call the
+    closure per frame:
+
+        is_active = bat.utils.state_check(S_ACTIVE)
+        ...
+        if is_active(ob): ...
+    '''
+    mask = _STATE_BITMASKS[state - 1]
+    def check(ob):
+        return (ob.state & mask) != 0
+    check.mask = mask
+    return check
+
+def state_adder(state):
+    '''Create a function that adds the given state to an object's state. See
+    state_check for the rationale and usage pattern.'''
+    mask = _STATE_BITMASKS[state - 1]
+    def add(ob):
+        ob.state |= mask
+    add.mask = mask
+    return add
+
+def state_remover(state):
+    '''Create a function that removes the given state from an object's state.
+    See state_check for the rationale and usage pattern.'''
+    mask = ~_STATE_BITMASKS[state - 1]
+    def rem(ob):
+        ob.state &= mask
+    rem.mask = mask
+    return rem
+
+def state_setter(state):
+    '''Create a function that sets an object's state to exactly the given
+    state. See state_check for the rationale and usage pattern.'''
+    mask = _STATE_BITMASKS[state - 1]
+    def set_(ob):
+        ob.state = mask
+    set_.mask = mask
+    return set_
+
+def add_state_many(obs, state):
+    '''Add a state to each object in an iterable. The mask is computed once
+    for the whole batch, so prefer this over calling add_state in a loop when
+    changing the state of many objects at once.'''
+    mask = _STATE_BITMASKS[state - 1]
+    for ob in obs:
+        ob.state |= mask
+
+def rem_state_many(obs, state):
+    '''Remove a state from each object in an iterable. See add_state_many.'''
+    mask = ~_STATE_BITMASKS[state - 1]
+    for ob in obs:
+        ob.state &= mask
+
+def set_state_many(obs, state):
+    '''Set each object in an iterable to exactly the given state. See
+    add_state_many.'''
+    mask = _STATE_BITMASKS[state - 1]
+    for ob in obs:
+        ob.state = mask
 
 def get_scene(ob):
     '''Get the scene that this object exists in. Sometimes this is preferred
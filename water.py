@@ -304,7 +304,7 @@ class Water(bat.bats.BX_GameObject, bge.types.KX_GameObject):
         self.floatingActors.update(hitActors)
         for actor in self.floatingActors.copy():
             root = actor
-            while root.parent != None:
+            while root.parent is not None:
                 root = root.parent
             if root is not actor:
                 self.floatingActors.remove(actor)